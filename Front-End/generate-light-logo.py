@@ -10,14 +10,23 @@ Strategy:
   - Alpha channel fully preserved
 
 Run:  python3 generate-light-logo.py
+      python3 generate-light-logo.py --palette   # 8-bit palette PNG (~5x smaller, lossy)
 
-Dependencies: Pillow (PIL) only — no numpy required.
+Dependencies: Pillow (PIL) + numpy. Optional: numba (single-pass JIT kernel).
 """
 
+import argparse
 import os
 import shutil
+
+import numpy as np
 from PIL import Image
 
+try:
+    from numba import njit, prange
+except ImportError:  # numba is optional; fall back to the NumPy path
+    njit = None
+
 # ──────────────────────────────────────────
 # PATHS
 # ──────────────────────────────────────────
@@ -36,86 +45,174 @@ DARK_COLOR  = (26, 26, 46)     # #1A1A2E (bgCard — deep navy)
 DARK_ACCENT = (55, 48, 120)    # Deep indigo-purple blend
 
 
-def pixel_brightness(r, g, b):
-    """ITU-R BT.601 perceived brightness."""
-    return 0.299 * r + 0.587 * g + 0.114 * b
+BT601_WEIGHTS = np.array([0.299, 0.587, 0.114], dtype=np.float32)
+
 
+def pixel_brightness(rgb):
+    """ITU-R BT.601 perceived brightness of (..., 3) RGB as float32.
+
+    Accumulated in place channel by channel (not via matmul) so the float32
+    rounding is fixed and matches the JIT kernel exactly.
+    """
+    brightness = rgb[..., 0] * BT601_WEIGHTS[0]
+    brightness += rgb[..., 1] * BT601_WEIGHTS[1]
+    brightness += rgb[..., 2] * BT601_WEIGHTS[2]
+    return brightness
 
-def pixel_saturation(r, g, b):
-    """Color saturation: 0 = pure gray, 255 = vivid color."""
-    return max(r, g, b) - min(r, g, b)
 
+def pixel_saturation(rgb):
+    """Color saturation: 0 = pure gray, 255 = vivid color.
 
-def darken_pixel(r, g, b, strength=0.85):
+    Computed as max - min on the uint8 channels directly (never negative, so
+    no promotion needed). Note this is not HSV saturation, which divides by max.
+    """
+    return rgb.max(axis=-1) - rgb.min(axis=-1)
+
+
+def build_darken_lut(strength):
+    """
+    Precompute the brightness-dependent part of darken_pixel for every
+    possible (quantized) brightness value. Returns a (256, 3) float32 table.
     """
-    Remap a light/white pixel to a dark navy tone.
+    dark = np.asarray(DARK_COLOR, dtype=np.float32)
+    accent = np.asarray(DARK_ACCENT, dtype=np.float32)
+    bright_factor = (np.arange(256, dtype=np.float32) / 255.0)[:, None]
+    # Blend between DARK_COLOR and DARK_ACCENT based on brightness
+    target = dark * bright_factor + accent * (1 - bright_factor)
+    return target * strength + dark * (1 - strength) * 0.7
+
+
+def darken_pixel(rgb, bright_idx, lut, strength=0.85):
+    """
+    Remap light/white pixels to a dark navy tone.
+    rgb: (..., 3) float32 channels; bright_idx: (...) uint8 brightness;
+    lut: table from build_darken_lut(strength).
     strength: 0.0 = keep original, 1.0 = full dark replacement
     """
-    bright_factor = pixel_brightness(r, g, b) / 255.0
-    result = []
-    for ch, orig in enumerate([r, g, b]):
-        # Blend between DARK_COLOR and DARK_ACCENT based on brightness
-        target = DARK_COLOR[ch] * bright_factor + DARK_ACCENT[ch] * (1 - bright_factor)
-        # Mix: mostly target, small amount of original for texture
-        val = target * strength + orig * (1 - strength) * 0.3 + DARK_COLOR[ch] * (1 - strength) * 0.7
-        result.append(int(max(0, min(255, val))))
-    return tuple(result)
-
-
-def process_logo(input_path, output_path, label):
+    # Mix: mostly target, small amount of original for texture
+    val = lut[bright_idx] + rgb * ((1 - strength) * 0.3)
+    return np.clip(val, 0, 255).astype(np.uint8)
+
+
+LUT_STRONG = build_darken_lut(0.85)
+LUT_MILD = build_darken_lut(0.65)
+
+
+if njit is not None:
+    @njit(parallel=True, cache=True)
+    def _remap_pixels(arr, out_rgb, weights, lut_strong, lut_mild, keep_strong, keep_mild):
+        """
+        Single pass over an RGBA image: classify each pixel and darken it
+        in place in out_rgb. Same arithmetic (float32) as the NumPy path.
+        Returns (visible, strong, mild) pixel counts.
+        """
+        w_r, w_g, w_b = weights[0], weights[1], weights[2]
+        n_visible = 0
+        n_strong = 0
+        n_mild = 0
+        for y in prange(arr.shape[0]):
+            for x in range(arr.shape[1]):
+                if arr[y, x, 3] == 0:
+                    continue
+                n_visible += 1
+                r, g, b = arr[y, x, 0], arr[y, x, 1], arr[y, x, 2]
+                brightness = np.float32(np.float32(r) * w_r + np.float32(g) * w_g) + np.float32(b) * w_b
+                saturation = max(r, g, b) - min(r, g, b)
+                if brightness > 150 and saturation < 70:
+                    lut, keep = lut_strong, keep_strong
+                    n_strong += 1
+                elif brightness > 100 and saturation < 50:
+                    lut, keep = lut_mild, keep_mild
+                    n_mild += 1
+                else:
+                    continue
+                idx = np.int64(np.rint(brightness))
+                for c in range(3):
+                    val = lut[idx, c] + np.float32(arr[y, x, c]) * keep
+                    out_rgb[y, x, c] = np.uint8(min(max(val, np.float32(0)), np.float32(255)))
+        return n_visible, n_strong, n_mild
+else:
+    _remap_pixels = None
+
+
+def remap_pixels(arr):
     """
-    Process a single logo PNG: darken light/white pixels,
-    preserve colorful pixels, maintain alpha.
+    Darken light/desaturated pixels of an (H, W, 4) uint8 RGBA array.
+    Returns (out_rgb, visible, strong, mild).
     """
-    print(f"\n  Processing: {label}")
-    print(f"  Input:  {input_path}")
+    rgb = arr[..., :3]
 
-    img = Image.open(input_path).convert('RGBA')
-    pixels = img.load()
-    width, height = img.size
+    if _remap_pixels is not None:
+        out_rgb = rgb.copy()
+        counts = _remap_pixels(arr, out_rgb, BT601_WEIGHTS, LUT_STRONG, LUT_MILD,
+                               np.float32((1 - 0.85) * 0.3), np.float32((1 - 0.65) * 0.3))
+        return (out_rgb,) + tuple(int(n) for n in counts)
 
-    dark_strong = 0
-    dark_mild = 0
-    total_visible = 0
+    alpha = arr[..., 3]
 
-    for y in range(height):
-        for x in range(width):
-            r, g, b, a = pixels[x, y]
+    brightness = pixel_brightness(rgb)   # float32
+    saturation = pixel_saturation(rgb)   # uint8
 
-            # Skip fully transparent pixels
-            if a == 0:
-                continue
+    # Skip fully transparent pixels
+    visible = alpha > 0
 
-            total_visible += 1
+    # Strong darkening: bright + desaturated = white/gray text/outlines
+    strong = visible & (brightness > 150) & (saturation < 70)
+    # Mild darkening: semi-bright grays
+    mild = visible & ~strong & (brightness > 100) & (saturation < 50)
 
-            brightness = pixel_brightness(r, g, b)
-            saturation = pixel_saturation(r, g, b)
+    # Brightness quantized to the LUT index (0-255)
+    bright_idx = np.rint(brightness).astype(np.uint8)
 
-            # Strong darkening: bright + desaturated = white/gray text/outlines
-            if brightness > 150 and saturation < 70:
-                nr, ng, nb = darken_pixel(r, g, b, strength=0.85)
-                pixels[x, y] = (nr, ng, nb, a)
-                dark_strong += 1
+    # Colorful or already dark pixels: keep as-is; only the selected
+    # pixels are promoted to float for the remap
+    out_rgb = rgb.copy()
+    out_rgb[strong] = darken_pixel(rgb[strong].astype(np.float32), bright_idx[strong], LUT_STRONG, strength=0.85)
+    out_rgb[mild] = darken_pixel(rgb[mild].astype(np.float32), bright_idx[mild], LUT_MILD, strength=0.65)
 
-            # Mild darkening: semi-bright grays
-            elif brightness > 100 and saturation < 50:
-                nr, ng, nb = darken_pixel(r, g, b, strength=0.65)
-                pixels[x, y] = (nr, ng, nb, a)
-                dark_mild += 1
+    return out_rgb, int(visible.sum()), int(strong.sum()), int(mild.sum())
 
-            # Colorful or already dark pixels: keep as-is
-
-    print(f"  Visible pixels: {total_visible:,}")
-    print(f"  Darkened (strong): {dark_strong:,}")
-    print(f"  Darkened (mild): {dark_mild:,}")
 
+def save_png(img, output_path, palette=False):
+    """
+    Save an RGBA image as PNG. With palette=True, quantize to a 256-color
+    palette (alpha kept in the palette) first: much smaller and faster to
+    encode, but the eye gradient has ~20k colors so edges shift slightly.
+    """
+    if palette:
+        img = img.quantize(256, method=Image.Quantize.FASTOCTREE, dither=Image.Dither.NONE)
     img.save(output_path, 'PNG', optimize=True)
+
+
+def process_logo(input_path, output_path, label, palette=False):
+    """
+    Process a single logo PNG: darken light/white pixels,
+    preserve colorful pixels, maintain alpha.
+    """
+    print(f"\n  Processing: {label}")
+    print(f"  Input:  {input_path}")
+
+    img = Image.open(input_path).convert('RGBA')
+    arr = np.asarray(img)
+    out_rgb, n_visible, n_strong, n_mild = remap_pixels(arr)
+
+    print(f"  Visible pixels: {n_visible:,}")
+    print(f"  Darkened (strong): {n_strong:,}")
+    print(f"  Darkened (mild): {n_mild:,}")
+
+    out = Image.fromarray(np.dstack([out_rgb, arr[..., 3]]), 'RGBA')
+    save_png(out, output_path, palette=palette)
     print(f"  Output: {output_path}")
 
     return output_path
 
 
 def main():
+    parser = argparse.ArgumentParser(description='Generate light-background RealSync logos')
+    parser.add_argument('--palette', action='store_true',
+                        help='write 8-bit palette PNGs instead of full RGBA')
+    args = parser.parse_args()
+
     print("=" * 50)
     print("RealSync Light-Background Logo Generator")
     print("=" * 50)
@@ -127,8 +224,8 @@ def main():
             return
 
     # Process both logos
-    full_out = process_logo(LOGO_FULL_PATH, OUT_FULL_PATH, 'Full Lockup (eye + wordmark)')
-    eye_out  = process_logo(LOGO_EYE_PATH, OUT_EYE_PATH, 'Eye-Only Icon')
+    full_out = process_logo(LOGO_FULL_PATH, OUT_FULL_PATH, 'Full Lockup (eye + wordmark)', args.palette)
+    eye_out  = process_logo(LOGO_EYE_PATH, OUT_EYE_PATH, 'Eye-Only Icon', args.palette)
 
     # Copy to Desktop for easy access
     desktop_full = os.path.join(DESKTOP, 'realsync-logo-light.png')
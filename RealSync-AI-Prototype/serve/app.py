@@ -32,10 +32,15 @@ from slowapi import Limiter, _rate_limit_exceeded_handler
 from slowapi.util import get_remote_address
 from slowapi.errors import RateLimitExceeded
 
-from serve.config import PORT, HOST, INFERENCE_TIMEOUT_S
+from serve.config import (
+    PORT, HOST, INFERENCE_TIMEOUT_S, FRAME_CONCURRENCY, INFERENCE_MAX_BATCH,
+    CV2_NUM_THREADS, TORCH_NUM_THREADS, TORCH_MATMUL_PRECISION,
+)
 
 _UUID_RE = re.compile(r"^[0-9a-f]{8}-[0-9a-f]{4}-[0-9a-f]{4}-[0-9a-f]{4}-[0-9a-f]{12}$", re.IGNORECASE)
-_frame_semaphore = asyncio.Semaphore(1)
+# Face detectors are thread-local and per-session state is locked, so
+# frames from different sessions can run on separate cores.
+_frame_semaphore = asyncio.Semaphore(FRAME_CONCURRENCY)
 
 
 def _rate_limit_key(request: Request) -> str:
@@ -64,9 +69,39 @@ elif not AI_API_KEY:
 # Lifespan
 # ---------------------------------------------------------------
 
+_MATMUL_PRECISIONS = {"highest", "high", "medium"}
+
+
+def _configure_runtime():
+    """Set explicit OpenCV/PyTorch thread budgets and matmul precision.
+
+    The inference pool already runs jobs in parallel; letting every cv2 call
+    and every forward pass also fan out to all cores oversubscribes the CPU.
+    """
+    import cv2
+    import torch
+
+    cv2.setNumThreads(CV2_NUM_THREADS)
+    if TORCH_NUM_THREADS > 0:
+        torch.set_num_threads(TORCH_NUM_THREADS)
+    # Opt-in only: "high"/"medium" lower precision for every fp32 model (Whisper
+    # on GPU, WavLM/DeBERTa on AMX CPUs), whose thresholds assume full fp32
+    if TORCH_MATMUL_PRECISION in _MATMUL_PRECISIONS:
+        torch.set_float32_matmul_precision(TORCH_MATMUL_PRECISION)
+    else:
+        logger.warning("Ignoring invalid TORCH_MATMUL_PRECISION=%r (expected one of %s)",
+                       TORCH_MATMUL_PRECISION, sorted(_MATMUL_PRECISIONS))
+    logger.info(
+        "Runtime: cv2 threads=%d torch threads=%d matmul precision=%s frame concurrency=%d max batch=%d",
+        cv2.getNumThreads(), torch.get_num_threads(), torch.get_float32_matmul_precision(),
+        FRAME_CONCURRENCY, INFERENCE_MAX_BATCH,
+    )
+
+
 @asynccontextmanager
 async def lifespan(app: FastAPI):
     """Pre-load all models and warm up on startup."""
+    _configure_runtime()
     logger.info("Pre-loading models...")
 
     face_det = _get_face_detector()
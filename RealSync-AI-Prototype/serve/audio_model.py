@@ -26,6 +26,7 @@ from serve.config import (
     AUDIO_AUTH_THRESHOLD_HIGH_RISK,
     AUDIO_SAMPLE_RATE,
     AUDIO_TARGET_LENGTH,
+    AUDIO_INT8,
 )
 
 MODEL_NAME = "WavLM-Audio"
@@ -75,6 +76,21 @@ class WavLMAudioClassifier(nn.Module):
         return logits
 
 
+def _quantize_int8(net):
+    """Dynamic int8 quantization of the Linear layers (weights int8, activations
+    quantized per batch). The transformer blocks are almost all Linear, so this
+    is most of the CPU time. Falls back to the fp32 model if unsupported.
+    """
+    try:
+        from torch.ao.quantization import quantize_dynamic
+
+        net = quantize_dynamic(net, {nn.Linear}, dtype=torch.qint8)
+        logger.info("Applied int8 dynamic quantization to %s", MODEL_NAME)
+    except Exception as exc:
+        logger.warning("int8 quantization failed, using fp32 %s: %s", MODEL_NAME, exc)
+    return net
+
+
 # ---------------------------------------------------------------
 # Lazy-loaded singleton
 # ---------------------------------------------------------------
@@ -125,6 +141,8 @@ def get_audio_model():
             # memory contention with CLIP + emotion running on GPU
             _device = "cpu"
             net = net.to(_device)
+            if AUDIO_INT8:
+                net = _quantize_int8(net)
             net._device = _device
             _model = net
             logger.info("Using device: %s", _device)
@@ -173,7 +191,7 @@ def predict_audio(audio_b64: str) -> dict:
         )
         input_values = inputs.input_values.to(device)  # (1, seq_len)
 
-        with torch.no_grad():
+        with torch.inference_mode():
             raw = model(input_values)
             logit = float(raw[0][0])
 
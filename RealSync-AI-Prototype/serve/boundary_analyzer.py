@@ -13,6 +13,34 @@ import numpy as np
 
 logger = logging.getLogger(__name__)
 
+_SIZE = 256
+
+
+def _build_region_masks(size):
+    """
+    uint8 masks (for cv2 mask= arguments) over an elliptical distance map:
+    inner = center 60% of the face, boundary ring = 60-85%, outer = beyond.
+    """
+    center = size // 2
+    y_grid, x_grid = np.ogrid[:size, :size]
+    # Normalized elliptical distance from center
+    ry, rx = size * 0.42, size * 0.35
+    dist = np.sqrt(((y_grid - center * 0.9) / ry) ** 2 +
+                   ((x_grid - center) / rx) ** 2)
+    inner = (dist < 0.65).astype(np.uint8)
+    boundary = ((dist >= 0.65) & (dist < 0.90)).astype(np.uint8)
+    outer = (dist >= 0.90).astype(np.uint8)
+    return inner, boundary, outer
+
+
+# Fixed for the 256x256 working size, so built once (all three are non-empty)
+_INNER_MASK, _BOUNDARY_MASK, _OUTER_MASK = _build_region_masks(_SIZE)
+
+
+def _masked_std(src, mask):
+    """Population std (per channel) over mask in one cv2.meanStdDev pass."""
+    return cv2.meanStdDev(src, mask=mask)[1].ravel()
+
 
 def analyze_boundary(face_crop_bgr: np.ndarray) -> dict:
     """
@@ -39,31 +67,15 @@ def analyze_boundary(face_crop_bgr: np.ndarray) -> dict:
         if h < 30 or w < 30:
             return _default_result()
 
-        resized = cv2.resize(face_crop_bgr, (256, 256))
+        resized = cv2.resize(face_crop_bgr, (_SIZE, _SIZE))
         gray = cv2.cvtColor(resized, cv2.COLOR_BGR2GRAY)
         gray_float = gray.astype(np.float32)
-        h, w = 256, 256
-
-        # Create face region masks
-        # Inner: center 60% of the face
-        # Boundary ring: between 60% and 85% of face extent
-        # Outer: beyond 85%
-        center_y, center_x = h // 2, w // 2
-        y_grid, x_grid = np.ogrid[:h, :w]
-        # Normalized elliptical distance from center
-        ry, rx = h * 0.42, w * 0.35
-        dist = np.sqrt(((y_grid - center_y * 0.9) / ry) ** 2 +
-                        ((x_grid - center_x) / rx) ** 2)
-
-        inner_mask = dist < 0.65
-        boundary_mask = (dist >= 0.65) & (dist < 0.90)
-        outer_mask = dist >= 0.90
 
         # 1. Texture consistency via Laplacian variance
-        laplacian = cv2.Laplacian(gray, cv2.CV_64F, ksize=3).astype(np.float64)
+        laplacian = cv2.Laplacian(gray, cv2.CV_64F, ksize=3)
 
-        inner_lap_var = np.var(laplacian[inner_mask]) if np.any(inner_mask) else 1.0
-        boundary_lap_var = np.var(laplacian[boundary_mask]) if np.any(boundary_mask) else 1.0
+        inner_lap_var = float(_masked_std(laplacian, _INNER_MASK)[0]) ** 2
+        boundary_lap_var = float(_masked_std(laplacian, _BOUNDARY_MASK)[0]) ** 2
 
         # Ratio: how different is the texture at the boundary vs inside
         # Real: ratio ~0.5-1.5 (natural gradient from face center to edge)
@@ -75,9 +87,9 @@ def analyze_boundary(face_crop_bgr: np.ndarray) -> dict:
         blurred = cv2.GaussianBlur(gray_float, (5, 5), 0)
         noise = gray_float - blurred
 
-        inner_noise_std = np.std(noise[inner_mask]) if np.any(inner_mask) else 1.0
-        boundary_noise_std = np.std(noise[boundary_mask]) if np.any(boundary_mask) else 1.0
-        outer_noise_std = np.std(noise[outer_mask]) if np.any(outer_mask) else 1.0
+        inner_noise_std = float(_masked_std(noise, _INNER_MASK)[0])
+        boundary_noise_std = float(_masked_std(noise, _BOUNDARY_MASK)[0])
+        outer_noise_std = float(_masked_std(noise, _OUTER_MASK)[0])
 
         # Noise inconsistency: how much the noise pattern changes across regions
         # Real: consistent noise model throughout (camera sensor noise)
@@ -90,23 +102,17 @@ def analyze_boundary(face_crop_bgr: np.ndarray) -> dict:
 
         # 3. Per-channel noise variance at boundary
         # Swapped faces often show different noise characteristics per color channel
-        # at the boundary (from color space conversion during swap)
-        boundary_pixels = boundary_mask
-        if np.any(boundary_pixels):
-            channel_noise_vars = []
-            for c in range(3):
-                channel = resized[:, :, c].astype(np.float32)
-                ch_blurred = cv2.GaussianBlur(channel, (5, 5), 0)
-                ch_noise = channel - ch_blurred
-                ch_var = np.var(ch_noise[boundary_pixels])
-                channel_noise_vars.append(ch_var)
-
-            # Cross-channel variance: how different are the noise levels per channel
-            # Real: similar noise in all channels (sensor noise is uniform)
-            # Fake: different noise per channel (color processing artifacts)
-            color_channel_var = float(np.std(channel_noise_vars) / (np.mean(channel_noise_vars) + 1e-6))
-        else:
-            color_channel_var = 0.0
+        # at the boundary (from color space conversion during swap).
+        # GaussianBlur filters each channel independently; meanStdDev reduces
+        # all three channels in one pass.
+        color_float = resized.astype(np.float32)
+        color_noise = color_float - cv2.GaussianBlur(color_float, (5, 5), 0)
+        channel_noise_vars = _masked_std(color_noise, _BOUNDARY_MASK) ** 2
+
+        # Cross-channel variance: how different are the noise levels per channel
+        # Real: similar noise in all channels (sensor noise is uniform)
+        # Fake: different noise per channel (color processing artifacts)
+        color_channel_var = float(np.std(channel_noise_vars) / (np.mean(channel_noise_vars) + 1e-6))
 
         # Score computation
         score = 1.0
@@ -14,19 +14,21 @@ MODELS_DIR = os.path.join(SRC_DIR, "models")
 # --- Emotion Model ---
 EMOTION_INPUT_SIZE = 128
 EMOTION_WEIGHTS_PATH = os.path.join(MODELS_DIR, "emotion_weights.pth")
+EMOTION_ONNX_PATH = os.path.join(MODELS_DIR, "emotion_weights.onnx")  # scripts/export_emotion_onnx.py
 EMOTION_LABELS = ["Happy", "Neutral", "Angry", "Fear", "Surprise", "Sad"]
+EMOTION_COMPILE = os.getenv("EMOTION_COMPILE", "0") == "1"  # torch.compile the PyTorch model (slower startup)
 
 # --- Audio Deepfake (WavLM) ---
 WAVLM_WEIGHTS_PATH = os.path.join(MODELS_DIR, "wavlm_audio_weights.pth")
 AUDIO_SAMPLE_RATE = 16000
 AUDIO_TARGET_LENGTH = 64000
+AUDIO_INT8 = os.getenv("AUDIO_INT8", "0") == "1"  # int8 dynamic quantization of WavLM Linear layers (CPU)
 AUDIO_AUTH_THRESHOLD_LOW_RISK = 0.55   # WebRTC audio scores lower than clean mic
 AUDIO_AUTH_THRESHOLD_HIGH_RISK = 0.30  # Spoofed audio clearly below this
 
 # --- Face Detection ---
 FACE_CONFIDENCE_THRESHOLD = 0.4
 FACE_PADDING_PERCENT = 0.3
-FACE_CROP_SIZE = 224
 
 # --- Deepfake Thresholds ---
 DEEPFAKE_AUTH_THRESHOLD_LOW_RISK = 0.50   # Recalibrated for 360p Recall.ai frames (was 0.60 for 1080p)
@@ -38,6 +40,7 @@ SPRT_BETA = 0.05               # Max false negative rate (miss a real fake)
 SPRT_REAL_MEAN = 0.65          # Recalibrated for 360p: real faces ~0.50-0.82 (was 0.70 for 1080p)
 SPRT_FAKE_MEAN = 0.32          # Recalibrated for 360p: deepfakes ~0.22-0.41 (was 0.35 for 1080p)
 SPRT_SCORE_STD = 0.12          # Tighter std for 360p distribution (was 0.14)
+SPRT_MAX_SESSIONS = 1000       # LRU cap on accumulator state (sessions missing cleanup calls)
 
 # --- Session ---
 SESSION_TTL_SECONDS = 3600
@@ -73,5 +76,19 @@ ENSEMBLE_WEIGHT_CLIP = 0.50       # Semantic/spatial analysis (CLIP ViT-L/14)
 ENSEMBLE_WEIGHT_FREQUENCY = 0.25  # Frequency-domain artifacts (DCT/FFT) — reduced: Zoom H.264 degrades signal
 ENSEMBLE_WEIGHT_BOUNDARY = 0.25   # Face boundary blending artifacts — boosted: more resilient to compression
 
+# --- Near-Duplicate Frame Cache (dHash) ---
+FRAME_CACHE_HAMMING_MAX = 3    # Max differing dHash bits (of 64) for a frame to count as unchanged
+# Re-run the full pipeline at least this often; 0 disables the cache. At ~2 fps
+# anything above ~0.5 s lets every other static frame skip CLIP/SPRT entirely.
+FRAME_CACHE_MAX_AGE_S = float(os.getenv("FRAME_CACHE_MAX_AGE_S", "0"))
+
 # --- Inference ---
 INFERENCE_TIMEOUT_S = 30
+INFERENCE_POOL_WORKERS = 4   # CLIP batch + emotion batch + per-face frequency/boundary jobs
+ANALYZER_TIMEOUT_S = 10      # Per-face frequency/boundary analyzers
+# Both clamped to >= 1: 0 would mean a zero-step batch loop / a semaphore that rejects every frame
+INFERENCE_MAX_BATCH = max(1, int(os.getenv("INFERENCE_MAX_BATCH", "32")))  # Faces per model forward pass
+FRAME_CONCURRENCY = max(1, int(os.getenv("FRAME_CONCURRENCY", "1")))  # Frames analyzed at once (raise on multi-core hosts)
+CV2_NUM_THREADS = int(os.getenv("CV2_NUM_THREADS", "1"))  # Parallelism comes from the pool; 256px ops don't need OpenCV threads
+TORCH_NUM_THREADS = int(os.getenv("TORCH_NUM_THREADS", "0"))  # Intra-op threads per forward pass (0 = PyTorch default)
+TORCH_MATMUL_PRECISION = os.getenv("TORCH_MATMUL_PRECISION", "highest")  # "high" opts every fp32 model into TF32 (CUDA + CPU mkldnn)
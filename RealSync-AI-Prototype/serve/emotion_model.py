@@ -2,9 +2,14 @@
 Emotion model — EfficientNet-B2 or MobileNetV2 fine-tuned for 7-class emotions.
 
 Architecture auto-detected from checkpoint metadata:
-  Backbone features → AdaptiveAvgPool2d → Flatten → feat_dim→256→7
+  ImageNet normalize → Backbone features → global avg pool → Flatten → feat_dim→256→7
+
+The model takes RGB in [0, 255]; normalization happens inside forward() on
+the model's device, so crops stay uint8 until they reach it.
 
 Loads weights from src/models/emotion_weights.pth (checkpoint format).
+On CPU-only hosts, prefers src/models/emotion_weights.onnx (exported by
+scripts/export_emotion_onnx.py) when onnxruntime is installed.
 Falls back gracefully if weights not found.
 
 7-class: angry, disgust, fear, happy, sad, surprise, neutral
@@ -13,16 +18,20 @@ Mapped to 6-class API: disgust → angry (existing convention).
 import logging
 import os
 import threading
+from typing import List
 
 import cv2
 import numpy as np
 import torch
 import torch.nn as nn
-from torchvision import models, transforms
+from torchvision import models
 
 logger = logging.getLogger(__name__)
 
-from serve.config import EMOTION_LABELS, EMOTION_INPUT_SIZE, EMOTION_WEIGHTS_PATH
+from serve.config import (
+    EMOTION_LABELS, EMOTION_INPUT_SIZE, EMOTION_WEIGHTS_PATH, EMOTION_ONNX_PATH, EMOTION_COMPILE,
+    INFERENCE_MAX_BATCH,
+)
 
 # ---------------------------------------------------------------
 # Model architecture (must match train_emotion.py EmotionNet)
@@ -41,6 +50,17 @@ _LABEL_TO_API = {
     "neutral": "Neutral",
 }
 
+# Same mapping as a (7, 6) 0/1 matrix, so the merge is one matmul per batch
+_API_LABELS = list(dict.fromkeys(_LABEL_TO_API.values()))
+_TRAIN_TO_API = np.zeros((len(_TRAIN_LABELS_7), len(_API_LABELS)))
+for _i, _label in enumerate(_TRAIN_LABELS_7):
+    _TRAIN_TO_API[_i, _API_LABELS.index(_LABEL_TO_API[_label])] = 1.0
+
+# ImageNet normalization folded into uint8 scale: (x - 255*mean) / (255*std)
+_MEAN_255 = np.array([0.485, 0.456, 0.406], dtype=np.float32) * 255.0
+_INV_STD_255 = 1.0 / (np.array([0.229, 0.224, 0.225], dtype=np.float32) * 255.0)
+
+
 # Backbone registry — must match train_emotion.py
 _BACKBONE_REGISTRY = {
     'efficientnet_b2': (1408, models.efficientnet_b2),
@@ -56,8 +76,10 @@ class EmotionNet(nn.Module):
         super().__init__()
         feat_dim, constructor = _BACKBONE_REGISTRY[backbone_name]
         backbone = constructor(weights=None)
+        # Non-persistent: checkpoints (state_dict) stay identical to training
+        self.register_buffer("mean_255", torch.from_numpy(_MEAN_255).view(1, 3, 1, 1), persistent=False)
+        self.register_buffer("inv_std_255", torch.from_numpy(_INV_STD_255).view(1, 3, 1, 1), persistent=False)
         self.features = backbone.features
-        self.pool = nn.AdaptiveAvgPool2d((1, 1))
         self.classifier = nn.Sequential(
             nn.Flatten(),
             nn.Dropout(0.4),
@@ -68,12 +90,40 @@ class EmotionNet(nn.Module):
         )
 
     def forward(self, x):
+        x = (x - self.mean_255) * self.inv_std_255
         x = self.features(x)
-        x = self.pool(x)
+        # Global average pool as a plain mean (parameter-free, same as
+        # AdaptiveAvgPool2d((1, 1)) but a native reduction on every backend)
+        x = x.mean(dim=(2, 3), keepdim=True)
         x = self.classifier(x)
         return x
 
 
+class OnnxEmotionNet:
+    """ONNX Runtime session exposed with the same call contract as EmotionNet.
+
+    Takes a (N, 3, H, W) RGB [0, 255] CPU tensor, returns (N, 7) logits as a tensor.
+    """
+
+    def __init__(self, onnx_path):
+        import onnxruntime as ort
+
+        opts = ort.SessionOptions()
+        opts.graph_optimization_level = ort.GraphOptimizationLevel.ORT_ENABLE_ALL
+        self._session = ort.InferenceSession(
+            onnx_path, sess_options=opts, providers=["CPUExecutionProvider"],
+        )
+        model_input = self._session.get_inputs()[0]
+        self._input_name = model_input.name
+        self.img_size = model_input.shape[-1]
+        self._device = "cpu"
+
+    def __call__(self, x):
+        batch = np.ascontiguousarray(x.numpy(), dtype=np.float32)
+        logits = self._session.run(None, {self._input_name: batch})[0]
+        return torch.from_numpy(logits)
+
+
 # ---------------------------------------------------------------
 # Lazy-loaded singleton
 # ---------------------------------------------------------------
@@ -85,13 +135,61 @@ _lock = threading.Lock()
 
 
 def _build_preprocess(img_size):
-    return transforms.Compose([
-        transforms.ToPILImage(),
-        transforms.Resize((img_size, img_size)),
-        transforms.ToTensor(),
-        transforms.Normalize(mean=[0.485, 0.456, 0.406],
-                             std=[0.229, 0.224, 0.225]),
-    ])
+    """BGR uint8 crop → (3, S, S) RGB uint8 tensor (normalized inside the model).
+
+    Resizes with cv2 on the uint8 crop (no PIL round-trip). Pass out= (an
+    (S, S, 3) uint8 array) to write straight into a preallocated
+    channels-last batch slot.
+    """
+    size = (img_size, img_size)
+
+    def preprocess(crop_bgr, out=None):
+        if out is None:
+            out = np.empty((img_size, img_size, 3), dtype=np.uint8)
+        h, w = crop_bgr.shape[:2]
+        # INTER_AREA matches PIL's antialiased bilinear when shrinking
+        interp = cv2.INTER_AREA if h > img_size or w > img_size else cv2.INTER_LINEAR
+        cv2.resize(crop_bgr, size, dst=out, interpolation=interp)
+        cv2.cvtColor(out, cv2.COLOR_BGR2RGB, dst=out)
+        # HWC memory viewed as CHW: a channels-last tensor, no transpose copy
+        return torch.from_numpy(out).permute(2, 0, 1)
+
+    preprocess.img_size = img_size
+    return preprocess
+
+
+def _compile_model(net, img_size):
+    """torch.compile the model and pay the compile cost now, not on the first frame.
+
+    Batch sizes vary per frame, so the graph is compiled with a dynamic batch
+    dimension. Falls back to the eager model if compilation fails.
+    """
+    try:
+        compiled = torch.compile(net, dynamic=True)
+        with torch.inference_mode():
+            # Same input as predict_emotion_batch: 2N faces (TTA) in channels-last
+            # layout, or dynamo recompiles on a stride guard at the first frame.
+            # Two sizes so the batch dim is traced as dynamic.
+            for n in (1, 2):
+                warmup = torch.zeros(2 * n, 3, img_size, img_size, device=net._device, dtype=net._dtype)
+                compiled(warmup.contiguous(memory_format=torch.channels_last))
+        compiled._device, compiled._dtype = net._device, net._dtype
+        logger.info("Emotion model compiled with torch.compile")
+        return compiled
+    except Exception as e:
+        logger.warning("torch.compile failed, using eager emotion model: %s", e)
+        return net
+
+
+def _onnx_export_is_current() -> bool:
+    """True if the ONNX export exists and is not older than the .pth weights."""
+    if not os.path.isfile(EMOTION_ONNX_PATH):
+        return False
+    if os.path.isfile(EMOTION_WEIGHTS_PATH) and os.path.getmtime(EMOTION_ONNX_PATH) < os.path.getmtime(EMOTION_WEIGHTS_PATH):
+        logger.warning("Ignoring stale %s (older than %s) — re-run scripts/export_emotion_onnx.py",
+                       EMOTION_ONNX_PATH, EMOTION_WEIGHTS_PATH)
+        return False
+    return True
 
 
 def get_emotion_model():
@@ -104,6 +202,24 @@ def get_emotion_model():
         if _model is not None:
             return None if _model is _LOAD_FAILED else _model
         try:
+            # Use CUDA (NVIDIA GPU), MPS (Apple Silicon), or CPU
+            _device = "cuda" if torch.cuda.is_available() else ("mps" if torch.backends.mps.is_available() else "cpu")
+
+            # CPU-only: prefer the exported ONNX graph if available
+            if _device == "cpu" and _onnx_export_is_current():
+                try:
+                    net = OnnxEmotionNet(EMOTION_ONNX_PATH)
+                    _preprocess = _build_preprocess(net.img_size)
+                    _model = net
+                    logger.info("Loaded ONNX emotion model from %s (%dx%d)", EMOTION_ONNX_PATH, net.img_size, net.img_size)
+                    logger.info("Emotion model ready")
+                    return _model
+                except ImportError:
+                    logger.warning("onnxruntime not installed — using PyTorch emotion weights")
+                except Exception as e:
+                    # Corrupt/incompatible export must not disable emotion when the .pth is fine
+                    logger.warning("Failed to load ONNX emotion model (%s) — using PyTorch emotion weights", e)
+
             if not os.path.isfile(EMOTION_WEIGHTS_PATH):
                 _model = _LOAD_FAILED
                 logger.warning("DISABLED: weights not found at %s", EMOTION_WEIGHTS_PATH)
@@ -118,14 +234,19 @@ def get_emotion_model():
             net = EmotionNet(num_classes=7, backbone_name=backbone_name)
             state_dict = checkpoint.get("model_state_dict", checkpoint)
             net.load_state_dict(state_dict)
-            # Use CUDA (NVIDIA GPU), MPS (Apple Silicon), or CPU
-            _device = "cuda" if torch.cuda.is_available() else ("mps" if torch.backends.mps.is_available() else "cpu")
             net = net.to(_device)
             net.train(False)
             net._device = _device
+            # Half precision on CUDA: the CNN is conv-bound and fp16 doubles tensor-core throughput
+            net._dtype = torch.float16 if _device == "cuda" else torch.float32
+            # Channels-last matches the NHWC batches built in predict_emotion_batch
+            # and the vectorized conv kernels (MobileNet depthwise convs especially)
+            net = net.to(dtype=net._dtype, memory_format=torch.channels_last)
+            if EMOTION_COMPILE:
+                net = _compile_model(net, img_size)
             _preprocess = _build_preprocess(img_size)
             _model = net  # Publish model AFTER _preprocess is set (ordering matters for readers outside lock)
-            logger.info("Loaded %s on %s (%dx%d)", backbone_name, _device, img_size, img_size)
+            logger.info("Loaded %s on %s (%dx%d, %s)", backbone_name, _device, img_size, img_size, net._dtype)
             logger.info("Emotion model ready")
         except Exception as e:
             logger.error("Failed to load emotion model: %s", e)
@@ -145,61 +266,82 @@ def predict_emotion(face_crop_bgr: np.ndarray) -> dict:
         {"label": str, "confidence": float, "scores": {label: float}}
         Labels are 6-class API labels: Happy, Neutral, Angry, Fear, Surprise, Sad
     """
+    return predict_emotion_batch([face_crop_bgr])[0]
+
+
+def predict_emotion_batch(face_crops_bgr: List[np.ndarray]) -> List[dict]:
+    """
+    Predict emotions for several BGR face crops with one forward pass.
+
+    Returns one result dict per crop, in input order (same format as
+    predict_emotion).
+    """
     model = get_emotion_model()
     if model is None:
-        return {
-            "label": "Neutral",
-            "confidence": 0.0,
-            "scores": {lbl: 0.0 for lbl in EMOTION_LABELS},
-        }
+        return [_default_result() for _ in face_crops_bgr]
+    if not face_crops_bgr:
+        return []
 
     try:
-        face_rgb = cv2.cvtColor(face_crop_bgr, cv2.COLOR_BGR2RGB)
         # I3: Read _preprocess after get_emotion_model() guarantees it's set
         preprocess = _preprocess or _build_preprocess(EMOTION_INPUT_SIZE)
         device = getattr(model, '_device', 'cpu')
-        tensor = preprocess(face_rgb).unsqueeze(0).to(device)
-
-        # TTA: average predictions from original + horizontal flip
-        with torch.no_grad():
-            logits = model(tensor)
-            logits_flip = model(torch.flip(tensor, dims=[3]))
-            probs = torch.softmax((logits + logits_flip) / 2, dim=1)[0]  # (7,)
-
-        # Build 7-class raw scores
-        raw_scores = {label: float(probs[i]) for i, label in enumerate(_TRAIN_LABELS_7)}
-
-        # Map to 6-class API scores (merge disgust into angry)
-        api_scores = {}
-        for train_label, prob in raw_scores.items():
-            api_label = _LABEL_TO_API[train_label]
-            api_scores[api_label] = api_scores.get(api_label, 0.0) + prob
-
-        # Ensure all 6 labels present
-        for label in EMOTION_LABELS:
-            if label not in api_scores:
-                api_scores[label] = 0.0
-
-        # Normalize to sum to 1
-        total = sum(api_scores.values())
-        if total > 0:
-            api_scores = {k: round(v / total, 4) for k, v in api_scores.items()}
-
-        dominant = max(api_scores, key=api_scores.get)
-
-        return {
-            "label": dominant,
-            "confidence": api_scores[dominant],
-            "scores": api_scores,
-        }
+        dtype = getattr(model, '_dtype', torch.float32)
+
+        chunk_probs = []
+        with torch.inference_mode():
+            for start in range(0, len(face_crops_bgr), INFERENCE_MAX_BATCH):
+                chunk = face_crops_bgr[start:start + INFERENCE_MAX_BATCH]
+                # Crops are resized into one preallocated uint8 NHWC batch (pinned
+                # on CUDA so the host-to-device copy is asynchronous), viewed as
+                # an NCHW tensor in channels-last layout; cast on the device
+                batch = torch.empty(
+                    len(chunk), preprocess.img_size, preprocess.img_size, 3,
+                    dtype=torch.uint8, pin_memory=(device == "cuda"),
+                )
+                batch_np = batch.numpy()
+                for i, crop in enumerate(chunk):
+                    preprocess(crop, out=batch_np[i])
+                batch = batch.permute(0, 3, 1, 2).to(device, non_blocking=(device == "cuda")).to(dtype)
+                # TTA: original + horizontal flip stacked into one forward pass
+                logits = model(torch.cat([batch, torch.flip(batch, dims=[3])])).float()
+                n = len(chunk)
+                chunk_probs.append(torch.softmax((logits[:n] + logits[n:]) / 2, dim=1))
+        probs = torch.cat(chunk_probs).cpu()  # (N, 7)
+
+        return _build_results(probs.numpy())
 
     except (cv2.error, ValueError, RuntimeError) as exc:
-        # cv2.error: invalid/corrupt image data passed to cvtColor
+        # cv2.error: invalid/corrupt image data passed to resize
         # ValueError: unexpected tensor shape from preprocessing
         # RuntimeError: PyTorch inference failure (e.g. device mismatch)
         logger.error("Prediction error: %s", exc)
-        return {
-            "label": "Neutral",
-            "confidence": 0.0,
-            "scores": {lbl: 0.0 for lbl in EMOTION_LABELS},
+        return [_default_result() for _ in face_crops_bgr]
+
+
+def _build_results(probs: np.ndarray) -> List[dict]:
+    """Map (N, 7) training-class probabilities to N 6-class API results."""
+    # Merge disgust into angry and renormalize, for all faces at once
+    api = probs.astype(np.float64) @ _TRAIN_TO_API  # (N, 6)
+    api /= np.maximum(api.sum(axis=1, keepdims=True), 1e-12)
+    api = api.round(4)
+    # Dominant label per face (argmax keeps the first label on ties, like max())
+    dominant = api.argmax(axis=1).tolist()
+    confidence = api.max(axis=1).tolist()
+
+    return [
+        {
+            "label": _API_LABELS[idx],
+            "confidence": conf,
+            "scores": dict(zip(_API_LABELS, row)),
         }
+        for idx, conf, row in zip(dominant, confidence, api.tolist())
+    ]
+
+
+def _default_result() -> dict:
+    return {
+        "label": "Neutral",
+        "confidence": 0.0,
+        "scores": {lbl: 0.0 for lbl in EMOTION_LABELS},
+    }
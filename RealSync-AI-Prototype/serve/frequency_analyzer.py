@@ -13,6 +13,42 @@ import numpy as np
 
 logger = logging.getLogger(__name__)
 
+# Face crops are analyzed at a fixed 256x256 resolution
+_SIZE = 256
+
+
+def _build_band_labels(size: int) -> np.ndarray:
+    """Label each DCT coefficient with its band: 0=low, 1=mid, 2=high.
+
+    Bands use the Manhattan distance from the DC component, normalized to
+    [0, 1]. A flat uint8 label map (64KB) replaces three dense float masks.
+    """
+    row_idx = np.arange(size).reshape(-1, 1)
+    col_idx = np.arange(size).reshape(1, -1)
+    norm_dist = (row_idx + col_idx) / (2 * size - 2)
+
+    labels = np.zeros((size, size), dtype=np.uint8)
+    labels[(norm_dist >= 0.20) & (norm_dist < 0.50)] = 1
+    labels[norm_dist >= 0.50] = 2
+    return labels.ravel()
+
+
+def _build_radius_labels(size: int):
+    """Integer distance of each FFT bin from the spectrum center.
+
+    Returns (flat radius map, number of rings, max ring used). Rings
+    1..max_ring-1 get a radial average; the DC bin and the corners do not.
+    """
+    center = size // 2
+    y_coords, x_coords = np.ogrid[:size, :size]
+    radius_map = np.sqrt((y_coords - center) ** 2 + (x_coords - center) ** 2).astype(np.intp)
+    return radius_map.ravel(), int(radius_map.max()) + 1, center
+
+
+_BAND_LABELS = _build_band_labels(_SIZE)
+_RADIUS_LABELS, _NUM_RINGS, _MAX_RING = _build_radius_labels(_SIZE)
+_RING_COUNTS = np.bincount(_RADIUS_LABELS, minlength=_NUM_RINGS).astype(np.float64)
+
 
 def analyze_frequency(face_crop_bgr: np.ndarray) -> dict:
     """
@@ -36,29 +72,24 @@ def analyze_frequency(face_crop_bgr: np.ndarray) -> dict:
     """
     try:
         gray = cv2.cvtColor(face_crop_bgr, cv2.COLOR_BGR2GRAY)
-        gray = cv2.resize(gray, (256, 256))
-        gray_float = gray.astype(np.float32) / 255.0
+        gray = cv2.resize(gray, (_SIZE, _SIZE))
+        # Convert and scale in the same buffer (one allocation, not two)
+        gray_float = gray.astype(np.float32)
+        gray_float /= 255.0
 
         # 2D DCT
         dct = cv2.dct(gray_float)
-        dct_abs = np.abs(dct)
-
-        h, w = dct_abs.shape
-        total_energy = np.sum(dct_abs ** 2) + 1e-10
-
-        # Frequency band masks using Manhattan distance from DC component
-        # This is much faster than the per-pixel loop
-        row_idx = np.arange(h).reshape(-1, 1)
-        col_idx = np.arange(w).reshape(1, -1)
-        norm_dist = (row_idx + col_idx) / (h + w - 2)
+        h, w = dct.shape
 
-        low_mask = norm_dist < 0.20
-        mid_mask = (norm_dist >= 0.20) & (norm_dist < 0.50)
-        high_mask = norm_dist >= 0.50
+        # Per-coefficient energy, computed once (squaring makes abs() redundant)
+        energy = np.square(dct)
+        total_energy = float(energy.sum()) + 1e-10
 
-        low_energy = np.sum(dct_abs[low_mask] ** 2)
-        mid_energy = np.sum(dct_abs[mid_mask] ** 2)
-        high_energy = np.sum(dct_abs[high_mask] ** 2)
+        # Low/mid/high band energies in one gather-reduce over the
+        # precomputed band labels (ravel() of the contiguous DCT is a view)
+        low_energy, mid_energy, high_energy = np.bincount(
+            _BAND_LABELS, weights=energy.ravel(), minlength=3,
+        )
 
         high_freq_ratio = float(high_energy / total_energy)
         mid_high_ratio = float((mid_energy + high_energy) / total_energy)
@@ -82,16 +113,13 @@ def analyze_frequency(face_crop_bgr: np.ndarray) -> dict:
         magnitude = np.log(np.abs(fft_shifted) + 1e-10)
 
         # Check for periodic peaks: GANs create regular grid patterns
-        # Subtract radial average to isolate peaks from natural 1/f falloff
-        center_y, center_x = h // 2, w // 2
-        y_coords, x_coords = np.ogrid[:h, :w]
-        radius_map = np.sqrt((y_coords - center_y) ** 2 + (x_coords - center_x) ** 2).astype(int)
-
-        radial_mean = np.zeros(magnitude.shape)
-        for r in range(1, min(center_y, center_x)):
-            ring = radius_map == r
-            if np.any(ring):
-                radial_mean[ring] = np.mean(magnitude[ring])
+        # Subtract radial average to isolate peaks from natural 1/f falloff.
+        # Per-ring means come from one bincount over the precomputed radius map.
+        ring_sums = np.bincount(_RADIUS_LABELS, weights=magnitude.ravel(), minlength=_NUM_RINGS)
+        ring_means = ring_sums / _RING_COUNTS
+        ring_means[0] = 0.0
+        ring_means[_MAX_RING:] = 0.0
+        radial_mean = ring_means[_RADIUS_LABELS].reshape(h, w)
 
         residual = magnitude - radial_mean
         # Peak score: how many strong deviations from radial average
@@ -8,6 +8,7 @@ import logging
 import sys
 import os
 import base64
+import binascii
 import datetime
 import re
 import time
@@ -32,7 +33,6 @@ if SRC_DIR not in sys.path:
 from serve.config import (
     FACE_CONFIDENCE_THRESHOLD,
     FACE_PADDING_PERCENT,
-    FACE_CROP_SIZE,
     EMOTION_LABELS,
     TRUST_WEIGHT_VIDEO,
     TRUST_WEIGHT_BEHAVIOR,
@@ -42,14 +42,18 @@ from serve.config import (
     TEMPORAL_SMOOTHING_MIN_FRAMES,
     TEMPORAL_WINDOW_SIZE,
     INFERENCE_TIMEOUT_S,
+    INFERENCE_POOL_WORKERS,
+    ANALYZER_TIMEOUT_S,
     ENSEMBLE_WEIGHT_CLIP,
     ENSEMBLE_WEIGHT_FREQUENCY,
     ENSEMBLE_WEIGHT_BOUNDARY,
     SESSION_TTL_SECONDS,
+    FRAME_CACHE_HAMMING_MAX,
+    FRAME_CACHE_MAX_AGE_S,
 )
 from serve.temporal_analyzer import TemporalAnalyzer
-from serve.emotion_model import predict_emotion, get_emotion_model
-from serve.clip_deepfake_model import predict_clip_deepfake, get_clip_deepfake_model
+from serve.emotion_model import predict_emotion_batch, get_emotion_model
+from serve.clip_deepfake_model import predict_clip_deepfake_batch, get_clip_deepfake_model
 from serve.sprt_detector import SPRTDetector
 from serve.frequency_analyzer import analyze_frequency
 from serve.boundary_analyzer import analyze_boundary
@@ -59,7 +63,7 @@ from serve.boundary_analyzer import analyze_boundary
 # Module-level state
 # ---------------------------------------------------------------
 
-_inference_pool = ThreadPoolExecutor(max_workers=2)
+_inference_pool = ThreadPoolExecutor(max_workers=INFERENCE_POOL_WORKERS)
 _temporal_analyzer = TemporalAnalyzer(window_size=TEMPORAL_WINDOW_SIZE)
 _sprt = SPRTDetector()
 
@@ -68,6 +72,31 @@ _last_seen: Dict[str, float] = {}
 _thread_local = threading.local()
 _no_face_lock = threading.Lock()
 
+# session_id -> (dHash, response, monotonic time) of the last fully analyzed frame
+_frame_cache: Dict[str, tuple] = {}
+_frame_cache_lock = threading.Lock()
+
+
+_FACE_MODEL_PATH = os.path.join(
+    os.path.dirname(os.path.dirname(__file__)),
+    "src", "models", "blaze_face_short_range.tflite",
+)
+_face_model_bytes: Optional[bytes] = None
+_face_model_lock = threading.Lock()
+
+
+def _get_face_model_bytes() -> bytes:
+    """Read the BlazeFace .tflite once per process; every thread's detector shares it."""
+    global _face_model_bytes
+    if _face_model_bytes is None:
+        with _face_model_lock:
+            if _face_model_bytes is None:
+                if not os.path.exists(_FACE_MODEL_PATH):
+                    raise FileNotFoundError(f"Face detection model not found at {_FACE_MODEL_PATH}")
+                with open(_FACE_MODEL_PATH, "rb") as f:
+                    _face_model_bytes = f.read()
+    return _face_model_bytes
+
 
 def _get_face_detector():
     """Load MediaPipe face detector (lazy, per-thread)."""
@@ -78,15 +107,8 @@ def _get_face_detector():
         import mediapipe as mp
         from mediapipe.tasks.python import BaseOptions, vision
 
-        model_path = os.path.join(
-            os.path.dirname(os.path.dirname(__file__)),
-            "src", "models", "blaze_face_short_range.tflite",
-        )
-        if not os.path.exists(model_path):
-            raise FileNotFoundError(f"Face detection model not found at {model_path}")
-
         options = vision.FaceDetectorOptions(
-            base_options=BaseOptions(model_asset_path=model_path),
+            base_options=BaseOptions(model_asset_buffer=_get_face_model_bytes()),
             min_detection_confidence=FACE_CONFIDENCE_THRESHOLD,
         )
         detector = vision.FaceDetector.create_from_options(options)
@@ -109,6 +131,8 @@ def _evict_stale_sessions():
     for sid in stale:
         _no_face_counters.pop(sid, None)
         _last_seen.pop(sid, None)
+        with _frame_cache_lock:
+            _frame_cache.pop(sid, None)
         _sprt.clear_session(sid)
         _temporal_analyzer.clear_session(sid)
 
@@ -117,6 +141,8 @@ def cleanup_session(session_id: str):
     with _no_face_lock:
         _no_face_counters.pop(session_id, None)
         _last_seen.pop(session_id, None)
+    with _frame_cache_lock:
+        _frame_cache.pop(session_id, None)
     _temporal_analyzer.clear_session(session_id)
     _sprt.clear_session(session_id)
 
@@ -125,14 +151,26 @@ def cleanup_session(session_id: str):
 # Frame decoding
 # ---------------------------------------------------------------
 
+# binascii strict mode (3.11+) validates the alphabet while decoding, instead
+# of the separate regex pass base64.b64decode(validate=True) makes first.
+# Older Pythons keep b64decode(validate=True): non-strict a2b_base64 would
+# silently drop invalid characters instead of rejecting the payload.
+if sys.version_info >= (3, 11):
+    def _b64decode_strict(data: str) -> bytes:
+        return binascii.a2b_base64(data, strict_mode=True)
+else:
+    def _b64decode_strict(data: str) -> bytes:
+        return base64.b64decode(data, validate=True)
+
+
 def decode_frame(frame_b64: str) -> Optional[np.ndarray]:
     """Decode a base64-encoded image (JPEG or PNG) into a BGR numpy array."""
     try:
         if len(frame_b64) > 10 * 1024 * 1024:  # 10MB limit for PNG frames
             logger.warning("Frame rejected: payload exceeds 10MB limit")
             return None
-        img_bytes = base64.b64decode(frame_b64, validate=True)
-        nparr = np.frombuffer(img_bytes, np.uint8)
+        img_bytes = _b64decode_strict(frame_b64)
+        nparr = np.frombuffer(img_bytes, np.uint8)  # zero-copy view
         img = cv2.imdecode(nparr, cv2.IMREAD_COLOR)
         if img is not None:
             h, w = img.shape[:2]
@@ -145,10 +183,62 @@ def decode_frame(frame_b64: str) -> Optional[np.ndarray]:
         return None
 
 
+# ---------------------------------------------------------------
+# Near-duplicate frame cache
+# ---------------------------------------------------------------
+
+def frame_dhash(img: np.ndarray) -> int:
+    """64-bit difference hash: sign of horizontal gradients on a 9x8 thumbnail."""
+    small = cv2.resize(img, (9, 8), interpolation=cv2.INTER_AREA)
+    gray = cv2.cvtColor(small, cv2.COLOR_BGR2GRAY)
+    bits = np.packbits(gray[:, 1:] > gray[:, :-1])
+    return int.from_bytes(bits.tobytes(), "big")
+
+
+def _face_hashes(img: np.ndarray, faces: List[Dict]) -> tuple:
+    """(padded box, dHash of that region) for each detected face."""
+    hashes = []
+    for face in faces:
+        x1, y1, x2, y2 = face["bbox_padded"]
+        hashes.append(((x1, y1, x2, y2), frame_dhash(img[y1:y2, x1:x2])))
+    return tuple(hashes)
+
+
+def _cached_response(session_id: str, img: np.ndarray, frame_hash: int,
+                     captured_at: Optional[str]) -> Optional[Dict]:
+    """Reuse the last response if this frame is a near-duplicate of the last analyzed one.
+
+    Both the whole frame and each face region of the last analyzed frame must
+    match: a swapped face on a static background barely moves the whole-frame hash.
+    """
+    with _frame_cache_lock:
+        entry = _frame_cache.get(session_id)
+    if entry is None:
+        return None
+    last_hash, last_faces, last_result, last_ts = entry
+    if time.monotonic() - last_ts > FRAME_CACHE_MAX_AGE_S:
+        return None
+    if (frame_hash ^ last_hash).bit_count() > FRAME_CACHE_HAMMING_MAX:
+        return None
+    for (x1, y1, x2, y2), face_hash in last_faces:
+        if (frame_dhash(img[y1:y2, x1:x2]) ^ face_hash).bit_count() > FRAME_CACHE_HAMMING_MAX:
+            return None
+    processed_at = _utcnow_iso()
+    return {**last_result, "capturedAt": captured_at or processed_at, "processedAt": processed_at}
+
+
 # ---------------------------------------------------------------
 # Face detection
 # ---------------------------------------------------------------
 
+def _to_rgb(img: np.ndarray) -> np.ndarray:
+    """BGR→RGB into a per-thread buffer, reused while the frame size is unchanged."""
+    buf = getattr(_thread_local, "rgb_buffer", None)
+    if buf is None or buf.shape != img.shape:
+        buf = _thread_local.rgb_buffer = np.empty_like(img)
+    return cv2.cvtColor(img, cv2.COLOR_BGR2RGB, dst=buf)
+
+
 def detect_faces(img: np.ndarray) -> List[Dict]:
     """Detect faces using MediaPipe Tasks API."""
     detector = _get_face_detector()
@@ -156,7 +246,8 @@ def detect_faces(img: np.ndarray) -> List[Dict]:
         return []
 
     h, w, _ = img.shape
-    rgb = cv2.cvtColor(img, cv2.COLOR_BGR2RGB)
+    # MediaPipe needs a contiguous RGB buffer, so this one conversion stays
+    rgb = _to_rgb(img)
 
     import mediapipe as mp
     mp_image = mp.Image(image_format=mp.ImageFormat.SRGB, data=rgb)
@@ -166,33 +257,37 @@ def detect_faces(img: np.ndarray) -> List[Dict]:
     if not results.detections:
         return faces
 
+    kept = []
     for i, det in enumerate(results.detections):
         confidence = det.categories[0].score if det.categories else 0.0
-        if confidence < FACE_CONFIDENCE_THRESHOLD:
-            continue
-
-        box = det.bounding_box
-        x, y, bw, bh = box.origin_x, box.origin_y, box.width, box.height
-
-        pad_w = int(bw * FACE_PADDING_PERCENT)
-        pad_h = int(bh * FACE_PADDING_PERCENT)
-        x1 = max(0, x - pad_w)
-        y1 = max(0, y - pad_h)
-        x2 = min(w, x + bw + pad_w)
-        y2 = min(h, y + bh + pad_h)
+        if confidence >= FACE_CONFIDENCE_THRESHOLD:
+            kept.append((i, confidence, det.bounding_box))
+    if not kept:
+        return faces
 
-        crop = img[y1:y2, x1:x2]
-        if crop.size == 0 or crop.shape[0] < 20 or crop.shape[1] < 20:
+    # Box math for all detections at once: (x, y, w, h) → padded, clipped (x1, y1, x2, y2)
+    boxes = np.array(
+        [(b.origin_x, b.origin_y, b.width, b.height) for _, _, b in kept], dtype=np.int64,
+    )
+    pads = (boxes[:, 2:] * FACE_PADDING_PERCENT).astype(np.int64)
+    x1y1 = np.maximum(boxes[:, :2] - pads, 0)
+    x2y2 = np.minimum(boxes[:, :2] + boxes[:, 2:] + pads, (w, h))
+    valid = ((x2y2 - x1y1) >= 20).all(axis=1)  # Drop crops under 20px (or empty)
+    padded = np.hstack([x1y1, x2y2])
+
+    for (i, confidence, _), (x, y, bw, bh), (x1, y1, x2, y2), ok in zip(
+        kept, boxes.tolist(), padded.tolist(), valid.tolist(),
+    ):
+        if not ok:
             continue
-
-        crop_resized = cv2.resize(crop, (FACE_CROP_SIZE, FACE_CROP_SIZE))
-
         faces.append({
             "face_id": i,
             "bbox": {"x": x, "y": y, "w": bw, "h": bh},
+            "bbox_padded": (x1, y1, x2, y2),
             "confidence": round(float(confidence), 4),
-            "crop": crop_resized,
-            "crop_original": crop,
+            # Zero-copy view into the frame; each model resizes it once to
+            # its own input size.
+            "crop": img[y1:y2, x1:x2],
         })
 
     return faces
@@ -202,16 +297,25 @@ def detect_faces(img: np.ndarray) -> List[Dict]:
 # Main pipeline
 # ---------------------------------------------------------------
 
+def _analyze_face_signals(crop: np.ndarray) -> tuple:
+    """Frequency + boundary analysis of one face crop as a single pool job.
+
+    Both analyzers catch their own errors and return neutral defaults.
+    """
+    return analyze_frequency(crop), analyze_boundary(crop)
+
+
 def analyze_frame(session_id: str, frame_b64: str, captured_at: Optional[str] = None) -> Dict:
     """
     Full analysis pipeline for a single frame.
 
     1. Decode image from base64
-    2. Detect faces
-    3. For each face: CLIP deepfake + emotion (parallel)
-    4. Feed CLIP score to SPRT accumulator
-    5. Temporal smoothing
-    6. Return response
+    2. Reuse the previous result if the frame is a near-duplicate (dHash)
+    3. Detect faces
+    4. CLIP deepfake + emotion batched over all faces (parallel)
+    5. Feed CLIP score to SPRT accumulator
+    6. Temporal smoothing
+    7. Return response
     """
     # TTL-based eviction: remove sessions not seen in 60 minutes
     with _no_face_lock:
@@ -227,6 +331,16 @@ def analyze_frame(session_id: str, frame_b64: str, captured_at: Optional[str] =
     if img is None:
         return _empty_response(session_id, captured_at)
 
+    # Unchanged frame: skip detection + models. SPRT/temporal are not re-fed
+    # so duplicates don't count as extra evidence.
+    frame_hash = None
+    if FRAME_CACHE_MAX_AGE_S > 0:
+        frame_hash = frame_dhash(img)
+        cached = _cached_response(session_id, img, frame_hash, captured_at)
+        if cached is not None:
+            logger.debug("Near-duplicate frame for session %s — reusing last result", session_id)
+            return cached
+
     faces = detect_faces(img)
     if len(faces) == 0:
         with _no_face_lock:
@@ -243,41 +357,44 @@ def analyze_frame(session_id: str, frame_b64: str, captured_at: Optional[str] =
     with _no_face_lock:
         _no_face_counters.pop(session_id, None)
 
-    face_results = []
-    for face_info in faces:
-        crop = face_info["crop"]
-        deepfake_crop = face_info.get("crop_original", crop)
-
-        # Run CLIP deepfake + emotion + frequency + boundary in parallel
-        clip_future = _inference_pool.submit(predict_clip_deepfake, deepfake_crop)
-        emo_future = _inference_pool.submit(predict_emotion, crop)
-        freq_future = _inference_pool.submit(analyze_frequency, deepfake_crop)
-        boundary_future = _inference_pool.submit(analyze_boundary, deepfake_crop)
-
-        clip_result = {"authenticityScore": None, "riskLevel": "unknown", "model": "timeout"}
-        emotion_result = {"label": "Neutral", "confidence": 0.0, "scores": {}}
-        freq_result = {"frequencyScore": 0.5, "highFreqRatio": 0.0, "spectralFlatness": 0.0}
-        boundary_result = {"boundaryScore": 0.5, "gradientDiscontinuity": 0.0, "colorShift": 0.0}
+    crops = [face_info["crop"] for face_info in faces]
 
-        try:
-            clip_result = clip_future.result(timeout=INFERENCE_TIMEOUT_S)
-        except FuturesTimeoutError:
-            logger.warning("CLIP model timed out for session %s", session_id)
+    # CLIP deepfake + emotion run once per frame on all faces (batched forward
+    # passes); frequency + boundary run as one job per face. All jobs run in parallel and
+    # share one deadline, so waits don't stack up across futures.
+    deadline = time.monotonic() + INFERENCE_TIMEOUT_S
 
-        try:
-            emotion_result = emo_future.result(timeout=INFERENCE_TIMEOUT_S)
-        except FuturesTimeoutError:
-            logger.warning("Emotion model timed out for session %s", session_id)
+    def _remaining(cap: float = INFERENCE_TIMEOUT_S) -> float:
+        return max(0.0, min(cap, deadline - time.monotonic()))
 
-        try:
-            freq_result = freq_future.result(timeout=10)
-        except (FuturesTimeoutError, Exception) as e:
-            logger.warning("Frequency analyzer failed for session %s: %s", session_id, e)
+    clip_future = _inference_pool.submit(predict_clip_deepfake_batch, crops)
+    emo_future = _inference_pool.submit(predict_emotion_batch, crops)
+    signal_futures = [_inference_pool.submit(_analyze_face_signals, c) for c in crops]
+
+    clip_results = [{"authenticityScore": None, "riskLevel": "unknown", "model": "timeout"} for _ in faces]
+    emotion_results = [{"label": "Neutral", "confidence": 0.0, "scores": {}} for _ in faces]
+
+    try:
+        clip_results = clip_future.result(timeout=_remaining())
+    except FuturesTimeoutError:
+        logger.warning("CLIP model timed out for session %s", session_id)
+
+    try:
+        emotion_results = emo_future.result(timeout=_remaining())
+    except FuturesTimeoutError:
+        logger.warning("Emotion model timed out for session %s", session_id)
+
+    face_results = []
+    for i, face_info in enumerate(faces):
+        clip_result = clip_results[i]
+        emotion_result = emotion_results[i]
+        freq_result = {"frequencyScore": 0.5, "highFreqRatio": 0.0, "spectralFlatness": 0.0}
+        boundary_result = {"boundaryScore": 0.5, "gradientDiscontinuity": 0.0, "colorShift": 0.0}
 
         try:
-            boundary_result = boundary_future.result(timeout=10)
+            freq_result, boundary_result = signal_futures[i].result(timeout=_remaining(ANALYZER_TIMEOUT_S))
         except (FuturesTimeoutError, Exception) as e:
-            logger.warning("Boundary analyzer failed for session %s: %s", session_id, e)
+            logger.warning("Frequency/boundary analyzers failed for session %s: %s", session_id, e)
 
         # Ensemble: weighted combination of all three detectors
         clip_score = clip_result.get("authenticityScore")
@@ -389,7 +506,7 @@ def analyze_frame(session_id: str, frame_b64: str, captured_at: Optional[str] =
     elapsed_ms = round((time.time() - start_time) * 1000, 1)
     logger.info("Frame analyzed in %sms — %d face(s), SPRT: %s", elapsed_ms, len(faces), sprt_result['decision'])
 
-    return {
+    response = {
         "sessionId": session_id,
         "capturedAt": captured_at or processed_at,
         "processedAt": processed_at,
@@ -407,6 +524,11 @@ def analyze_frame(session_id: str, frame_b64: str, captured_at: Optional[str] =
             "temporal": temporal,
         },
     }
+    if frame_hash is not None:
+        entry = (frame_hash, _face_hashes(img, faces), response, time.monotonic())
+        with _frame_cache_lock:
+            _frame_cache[session_id] = entry
+    return response
 
 
 def _empty_response(session_id: str, captured_at: str = None) -> Dict:
@@ -15,11 +15,14 @@ Usage:
             # Decision reached with 95% confidence
 """
 import math
+import threading
+from collections import OrderedDict
 
 from serve.config import (
     SPRT_ALPHA,
     SPRT_BETA,
     SPRT_FAKE_MEAN,
+    SPRT_MAX_SESSIONS,
     SPRT_REAL_MEAN,
     SPRT_SCORE_STD,
 )
@@ -35,6 +38,7 @@ class SPRTDetector:
         real_mean: float = None,
         fake_mean: float = None,
         score_std: float = None,
+        max_sessions: int = None,
     ):
         self.alpha = alpha or SPRT_ALPHA
         self.beta = beta or SPRT_BETA
@@ -46,18 +50,34 @@ class SPRTDetector:
         self.upper_bound = math.log((1 - self.beta) / self.alpha)    # → decide FAKE
         self.lower_bound = math.log(self.beta / (1 - self.alpha))    # → decide REAL
 
-        self._sessions = {}
+        # LRU-ordered so sessions that never call clear_session are evicted
+        self.max_sessions = max_sessions or SPRT_MAX_SESSIONS
+        self._sessions = OrderedDict()
+        self._lock = threading.Lock()
 
-    def _get_session(self, session_id: str) -> dict:
-        if session_id not in self._sessions:
-            self._sessions[session_id] = {
+    def _get_or_create_session(self, session_id: str) -> dict:
+        """Return the session's state, creating it (and LRU-evicting) if new.
+
+        Caller must hold self._lock. Only the write path (update) creates state.
+        """
+        state = self._sessions.get(session_id)
+        if state is None:
+            state = self._sessions[session_id] = {
                 "llr": 0.0,
                 "n": 0,
                 "decision": "undecided",
                 "confidence": 0.5,
-                "scores": [],
+                # Running score statistics (Welford) instead of a score list
+                "score_mean": 0.0,
+                "score_m2": 0.0,
+                "score_min": 1.0,
+                "score_max": 0.0,
             }
-        return self._sessions[session_id]
+            while len(self._sessions) > self.max_sessions:
+                self._sessions.popitem(last=False)
+        else:
+            self._sessions.move_to_end(session_id)
+        return state
 
     def update(self, session_id: str, authenticity_score: float) -> dict:
         """
@@ -75,45 +95,60 @@ class SPRTDetector:
                 "logLikelihoodRatio": float,
             }
         """
-        if authenticity_score is None:
-            return self._format_result(session_id)
-
-        state = self._get_session(session_id)
-
-        # Already decided — don't accumulate further
-        if state["decision"] != "undecided":
-            return self._format_result(session_id)
-
-        # Clamp score to avoid log(0) / division issues
-        score = max(0.01, min(0.99, authenticity_score))
-        state["n"] += 1
-        state["scores"].append(score)
-
-        # Gaussian log-likelihood ratio: log(P(score|fake) / P(score|real))
-        std = self.score_std
-        ll_fake = -0.5 * ((score - self.fake_mean) / std) ** 2
-        ll_real = -0.5 * ((score - self.real_mean) / std) ** 2
-        llr_increment = ll_fake - ll_real
-
-        state["llr"] += llr_increment
-
-        # Check decision boundaries
-        if state["llr"] >= self.upper_bound:
-            state["decision"] = "fake"
-            state["confidence"] = round(1.0 - self.alpha, 4)
-        elif state["llr"] <= self.lower_bound:
-            state["decision"] = "real"
-            state["confidence"] = round(1.0 - self.beta, 4)
-        else:
-            # Compute progress toward decision as confidence
-            total_range = self.upper_bound - self.lower_bound
-            position = (state["llr"] - self.lower_bound) / total_range
-            state["confidence"] = round(max(0.0, min(1.0, position)), 4)
-
-        return self._format_result(session_id)
-
-    def _format_result(self, session_id: str) -> dict:
-        state = self._get_session(session_id)
+        # The whole read-modify-write runs under the lock: it is a handful of
+        # float ops, and concurrent frames of one session must not interleave
+        with self._lock:
+            if authenticity_score is None:
+                return self._format_result(self._sessions.get(session_id))
+
+            state = self._get_or_create_session(session_id)
+
+            # Already decided — don't accumulate further
+            if state["decision"] != "undecided":
+                return self._format_result(state)
+
+            # Clamp score to avoid log(0) / division issues
+            score = max(0.01, min(0.99, authenticity_score))
+            state["n"] += 1
+            delta = score - state["score_mean"]
+            state["score_mean"] += delta / state["n"]
+            state["score_m2"] += delta * (score - state["score_mean"])
+            state["score_min"] = min(state["score_min"], score)
+            state["score_max"] = max(state["score_max"], score)
+
+            # Gaussian log-likelihood ratio: log(P(score|fake) / P(score|real))
+            std = self.score_std
+            ll_fake = -0.5 * ((score - self.fake_mean) / std) ** 2
+            ll_real = -0.5 * ((score - self.real_mean) / std) ** 2
+            llr_increment = ll_fake - ll_real
+
+            state["llr"] += llr_increment
+
+            # Check decision boundaries
+            if state["llr"] >= self.upper_bound:
+                state["decision"] = "fake"
+                state["confidence"] = round(1.0 - self.alpha, 4)
+            elif state["llr"] <= self.lower_bound:
+                state["decision"] = "real"
+                state["confidence"] = round(1.0 - self.beta, 4)
+            else:
+                # Compute progress toward decision as confidence
+                total_range = self.upper_bound - self.lower_bound
+                position = (state["llr"] - self.lower_bound) / total_range
+                state["confidence"] = round(max(0.0, min(1.0, position)), 4)
+
+            return self._format_result(state)
+
+    @staticmethod
+    def _format_result(state) -> dict:
+        """Decision dict for a session state (None = unknown session, no frames)."""
+        if state is None:
+            return {
+                "decision": "undecided",
+                "confidence": 0.5,
+                "framesAnalyzed": 0,
+                "logLikelihoodRatio": 0.0,
+            }
         return {
             "decision": state["decision"],
             "confidence": state["confidence"],
@@ -122,25 +157,30 @@ class SPRTDetector:
         }
 
     def get_session_stats(self, session_id: str) -> dict:
-        """Get detailed stats for a session (for debugging/calibration)."""
-        state = self._get_session(session_id)
-        scores = state["scores"]
-        if not scores:
-            return {"framesAnalyzed": 0}
-        import numpy as np
-        return {
-            "framesAnalyzed": state["n"],
-            "decision": state["decision"],
-            "scoreMean": round(float(np.mean(scores)), 4),
-            "scoreStd": round(float(np.std(scores)), 4),
-            "scoreMin": round(float(min(scores)), 4),
-            "scoreMax": round(float(max(scores)), 4),
-        }
+        """Get detailed stats for a session (for debugging/calibration).
+
+        Read-only: an unknown or evicted session is not recreated.
+        """
+        with self._lock:
+            state = self._sessions.get(session_id)
+            n = state["n"] if state is not None else 0
+            if not n:
+                return {"framesAnalyzed": 0}
+            return {
+                "framesAnalyzed": n,
+                "decision": state["decision"],
+                "scoreMean": round(state["score_mean"], 4),
+                "scoreStd": round(math.sqrt(state["score_m2"] / n), 4),
+                "scoreMin": round(state["score_min"], 4),
+                "scoreMax": round(state["score_max"], 4),
+            }
 
     def clear_session(self, session_id: str):
         """Remove a session's accumulated state."""
-        self._sessions.pop(session_id, None)
+        with self._lock:
+            self._sessions.pop(session_id, None)
 
     def clear_all(self):
         """Clear all session states."""
-        self._sessions.clear()
+        with self._lock:
+            self._sessions.clear()
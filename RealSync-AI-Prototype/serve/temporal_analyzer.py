@@ -36,6 +36,22 @@ class TemporalAnalyzer:
         # session_id -> last access timestamp
         self._last_access: Dict[str, float] = {}
         self._lock = threading.Lock()
+        # EWMA weight vectors indexed by buffer length (see _build_ewma_weights)
+        self._ewma_weights = [self._build_ewma_weights(n) for n in range(window_size + 1)]
+
+    @staticmethod
+    def _build_ewma_weights(n: int) -> np.ndarray:
+        """Closed-form weights of the chronological EWMA over n scores.
+
+        Unrolling ewma = decay*ewma + (1-decay)*score from scores[0] gives
+        weight decay^(n-1) for the oldest score and (1-decay)*decay^(n-1-i)
+        for every later score i, so the whole recurrence is one dot product.
+        """
+        if n == 0:
+            return np.zeros(0)
+        weights = (1 - TEMPORAL_EWMA_DECAY) * TEMPORAL_EWMA_DECAY ** np.arange(n - 1, -1, -1, dtype=np.float64)
+        weights[0] = TEMPORAL_EWMA_DECAY ** (n - 1)
+        return weights
 
     def _evict_stale_sessions(self):
         """Remove sessions that haven't been accessed within SESSION_TTL_SECONDS.
@@ -89,17 +105,20 @@ class TemporalAnalyzer:
             }
             buf.append(snapshot)
 
+            # Trust scores in chronological order, shared by all helpers below
+            scores = np.fromiter((s["trustScore"] for s in buf), dtype=np.float64, count=len(buf))
+
             # Compute smoothed trust score (EWMA with decay=0.85)
-            smoothed = self._compute_ewma(buf)
+            smoothed = self._compute_ewma(scores)
 
             # Compute trend direction
-            trend = self._compute_trend(buf)
+            trend = self._compute_trend(scores)
 
             # Compute volatility (std dev of trust scores)
-            volatility = self._compute_volatility(buf)
+            volatility = self._compute_volatility(scores)
 
             # Detect anomalies
-            anomalies = self._detect_anomalies(buf, snapshot)
+            anomalies = self._detect_anomalies(buf, scores, snapshot)
 
             return {
                 "smoothedTrustScore": round(smoothed, 4),
@@ -109,7 +128,7 @@ class TemporalAnalyzer:
                 "anomalies": anomalies,
             }
 
-    def _compute_ewma(self, buf: deque) -> float:
+    def _compute_ewma(self, scores: np.ndarray) -> float:
         """Compute exponentially-weighted moving average of trust scores.
 
         Iterates chronologically (oldest to newest). Each new observation is
@@ -119,28 +138,23 @@ class TemporalAnalyzer:
         step, so the net effect weights recent frames highest (the newest frame
         dominates the running average over time).
         """
-        if not buf:
+        if len(scores) == 0:
             return 0.5
 
-        scores = [s["trustScore"] for s in buf]
-
-        ewma = scores[0]
-        for i in range(1, len(scores)):
-            ewma = TEMPORAL_EWMA_DECAY * ewma + (1 - TEMPORAL_EWMA_DECAY) * scores[i]
+        ewma = float(np.dot(self._ewma_weights[len(scores)], scores))
 
         return max(0.0, min(1.0, ewma))
 
-    def _compute_trend(self, buf: deque) -> str:
+    def _compute_trend(self, scores: np.ndarray) -> str:
         """Compare first 5 vs last 5 frames to determine trend.
 
         Requires at least 10 frames so the two windows (first 5, last 5) do not
         overlap.  With fewer frames the trend is indeterminate, so return
         "stable" as a neutral default.
         """
-        if len(buf) < 10:
+        if len(scores) < 10:
             return "stable"
 
-        scores = [s["trustScore"] for s in buf]
         first_avg = np.mean(scores[:5])
         last_avg = np.mean(scores[-5:])
 
@@ -151,23 +165,20 @@ class TemporalAnalyzer:
             return "declining"
         return "stable"
 
-    def _compute_volatility(self, buf: deque) -> float:
+    def _compute_volatility(self, scores: np.ndarray) -> float:
         """Compute standard deviation of trust scores in the buffer."""
-        if len(buf) < 2:
+        if len(scores) < 2:
             return 0.0
 
-        scores = [s["trustScore"] for s in buf]
         return float(np.std(scores))
 
-    def _detect_anomalies(self, buf: deque, current: Dict) -> List[Dict]:
+    def _detect_anomalies(self, buf: deque, scores: np.ndarray, current: Dict) -> List[Dict]:
         """Detect anomalies by comparing current frame to buffer history."""
         anomalies = []
 
         if len(buf) < 3:
             return anomalies
 
-        scores = [s["trustScore"] for s in buf]
-
         # 1. Sudden trust drop: current trust > threshold below buffer mean
         buffer_mean = np.mean(scores[:-1])  # exclude current frame
         if buffer_mean - current["trustScore"] > TEMPORAL_TRUST_DROP_THRESHOLD:
@@ -26,6 +26,14 @@ class TestDecodeFrame:
         result = decode_frame(b64)
         assert result is None
 
+    def test_invalid_base64_characters_rejected(self):
+        """Non-alphabet characters are rejected, not silently skipped."""
+        img = np.zeros((64, 64, 3), dtype=np.uint8)
+        _, buf = cv2.imencode(".jpg", img)
+        b64 = base64.b64encode(buf.tobytes()).decode()
+        mid = len(b64) // 2 - (len(b64) // 2) % 4
+        assert decode_frame(b64[:mid] + "!$*#" + b64[mid:]) is None
+
     def test_oversized_payload(self):
         """Payload > 10MB returns None."""
         big = base64.b64encode(b"\x00" * (11 * 1024 * 1024)).decode()
@@ -49,6 +57,39 @@ class TestDecodeFrame:
         assert result is None
 
 
+class TestDetectFaces:
+    @staticmethod
+    def _stub_detector(monkeypatch, boxes):
+        """Replace the MediaPipe detector with one returning fixed (x, y, w, h) boxes."""
+        from types import SimpleNamespace
+        import serve.inference as inference
+
+        detections = [
+            SimpleNamespace(
+                categories=[SimpleNamespace(score=0.9)],
+                bounding_box=SimpleNamespace(origin_x=x, origin_y=y, width=bw, height=bh),
+            )
+            for x, y, bw, bh in boxes
+        ]
+        detector = SimpleNamespace(detect=lambda _image: SimpleNamespace(detections=detections))
+        monkeypatch.setattr(inference, "_get_face_detector", lambda: detector)
+        return inference
+
+    def test_fully_off_frame_boxes_are_dropped(self, monkeypatch):
+        """Boxes entirely outside the frame yield no face (the old scalar code
+        turned off-top/left boxes into bogus crops via negative slice ends)."""
+        inference = self._stub_detector(monkeypatch, [
+            (50, -200, 60, 60),    # above the frame
+            (-300, 40, 60, 60),    # left of the frame
+            (400, 40, 60, 60),     # right of the frame
+            (80, 60, 100, 100),    # on-frame
+        ])
+        faces = inference.detect_faces(np.zeros((256, 256, 3), dtype=np.uint8))
+        assert [f["face_id"] for f in faces] == [3]
+        assert faces[0]["bbox_padded"] == (50, 30, 210, 190)
+        assert faces[0]["crop"].shape == (160, 160, 3)
+
+
 class TestAnalyzeFrame:
     def test_invalid_session_id(self):
         """AI-P-05: Invalid session ID returns 'invalid' sessionId."""
@@ -120,3 +161,111 @@ class TestTrustScoreFormula:
 
         # trust = 0.55*0.9 + 0.45*0.9 = 0.495 + 0.405 = 0.9
         assert abs(expected - 0.9) < 0.01
+
+
+class TestMultiFace:
+    def test_batched_models_one_result_per_face(self, monkeypatch):
+        """Batched CLIP/emotion results are assembled per face, in order."""
+        import serve.inference as inference
+
+        rng = np.random.default_rng(0)
+        frame = rng.integers(0, 256, size=(240, 320, 3), dtype=np.uint8)
+
+        def fake_detect(img):
+            return [
+                {
+                    "face_id": i,
+                    "bbox": {"x": 10 + 100 * i, "y": 20, "w": 80, "h": 90},
+                    "confidence": 0.9,
+                    "crop": img[20:110, 10 + 100 * i:90 + 100 * i],
+                }
+                for i in range(2)
+            ]
+
+        monkeypatch.setattr(inference, "detect_faces", fake_detect)
+        _, buf = cv2.imencode(".png", frame)
+        result = analyze_frame("test-multi-face", base64.b64encode(buf.tobytes()).decode())
+        cleanup_session("test-multi-face")
+
+        assert [f["faceId"] for f in result["faces"]] == [0, 1]
+        for face in result["faces"]:
+            assert "frequency" in face["deepfake"]["components"]
+            assert "label" in face["emotion"]
+
+
+class TestFrameCache:
+    @pytest.fixture
+    def detect_calls(self, monkeypatch):
+        """Enable the cache and stub detection with one fixed face; returns the call log."""
+        import serve.inference as inference
+
+        calls = []
+
+        def fake_detect(img):
+            calls.append(1)
+            return [{
+                "face_id": 0,
+                "bbox": {"x": 10, "y": 20, "w": 80, "h": 90},
+                "bbox_padded": (10, 20, 90, 110),
+                "confidence": 0.9,
+                "crop": img[20:110, 10:90],
+            }]
+
+        monkeypatch.setattr(inference, "FRAME_CACHE_MAX_AGE_S", 1.0)
+        monkeypatch.setattr(inference, "detect_faces", fake_detect)
+        return calls
+
+    def test_near_duplicate_frame_reuses_result(self, detect_calls):
+        """Identical consecutive frames skip detection and reuse the last response."""
+        calls = detect_calls
+        rng = np.random.default_rng(1)
+        frame = rng.integers(0, 256, size=(240, 320, 3), dtype=np.uint8)
+        _, buf = cv2.imencode(".png", frame)
+        b64 = base64.b64encode(buf.tobytes()).decode()
+
+        sid = "test-frame-cache"
+        first = analyze_frame(sid, b64, captured_at="t1")
+        second = analyze_frame(sid, b64, captured_at="t2")
+        assert len(calls) == 1
+        assert second["capturedAt"] == "t2"
+        assert second["faces"] == first["faces"]
+        assert second["aggregated"]["sprt"] == first["aggregated"]["sprt"]
+
+        # A visibly different frame runs the full pipeline again
+        _, buf = cv2.imencode(".png", 255 - frame)
+        analyze_frame(sid, base64.b64encode(buf.tobytes()).decode())
+        assert len(calls) == 2
+
+        cleanup_session(sid)
+        analyze_frame(sid, b64)
+        assert len(calls) == 3
+        cleanup_session(sid)
+
+    def test_dhash_distance(self):
+        from serve.inference import frame_dhash
+
+        rng = np.random.default_rng(2)
+        frame = cv2.GaussianBlur(rng.integers(0, 256, size=(360, 640, 3), dtype=np.uint8), (31, 31), 0)
+        noisy = np.clip(frame.astype(np.int16) + rng.integers(-1, 2, frame.shape), 0, 255).astype(np.uint8)
+        assert (frame_dhash(frame) ^ frame_dhash(noisy)).bit_count() <= 3
+        assert (frame_dhash(frame) ^ frame_dhash(frame[:, ::-1])).bit_count() > 3
+
+    def test_changed_face_on_static_background_is_not_cached(self, detect_calls):
+        """A face swapped inside an unchanged scene must run the full pipeline."""
+        from serve.inference import frame_dhash
+
+        rng = np.random.default_rng(3)
+        background = cv2.GaussianBlur(rng.integers(0, 256, size=(240, 320, 3), dtype=np.uint8), (31, 31), 0)
+        face_a = rng.integers(100, 156, size=(90, 80, 3), dtype=np.uint8)
+        frame_a, frame_b = background.copy(), background.copy()
+        frame_a[20:110, 10:90] = face_a
+        frame_b[20:110, 10:90] = face_a[::-1, ::-1]  # same pixels, rearranged
+        # The whole-frame hash alone cannot tell these apart
+        assert (frame_dhash(frame_a) ^ frame_dhash(frame_b)).bit_count() <= 3
+
+        sid = "test-frame-cache-face"
+        for frame in (frame_a, frame_b):
+            _, buf = cv2.imencode(".png", frame)
+            analyze_frame(sid, base64.b64encode(buf.tobytes()).decode())
+        assert len(detect_calls) == 2
+        cleanup_session(sid)
@@ -0,0 +1,237 @@
+"""Tests for the model wrappers (batched CLIP deepfake + emotion inference).
+
+Weights are not available in CI, so these tests inject small stand-in
+networks into the lazy singletons and check the batching contract: one
+result per crop, in input order, matching the single-crop API.
+"""
+import numpy as np
+import pytest
+import torch
+import torch.nn as nn
+
+import serve.clip_deepfake_model as clip_model
+import serve.emotion_model as emotion_model
+from serve.config import EMOTION_LABELS
+
+
+def _crops(n, seed=0):
+    rng = np.random.default_rng(seed)
+    return [rng.integers(0, 256, size=(60 + 10 * i, 50 + 7 * i, 3), dtype=np.uint8) for i in range(n)]
+
+
+class _MeanBrightnessNet(nn.Module):
+    """Stand-in for the CLIP detector: real-logit grows with mean brightness."""
+
+    def forward(self, x):
+        m = x.mean(dim=(1, 2, 3))
+        return torch.stack([m, -m], dim=1)
+
+
+@pytest.fixture
+def stub_emotion(monkeypatch):
+    torch.manual_seed(0)
+    net = emotion_model.EmotionNet(num_classes=7, backbone_name="mobilenetv2")
+    net.train(False)
+    net._device = "cpu"
+    monkeypatch.setattr(emotion_model, "_model", net)
+    monkeypatch.setattr(emotion_model, "_preprocess", emotion_model._build_preprocess(64))
+    return net
+
+
+@pytest.fixture
+def stub_clip(monkeypatch):
+    net = _MeanBrightnessNet()
+    net._device = "cpu"
+    monkeypatch.setattr(clip_model, "_model", net)
+    return net
+
+
+class TestEmotionBatch:
+    def test_batch_matches_single(self, stub_emotion):
+        crops = _crops(3)
+        batched = emotion_model.predict_emotion_batch(crops)
+        assert len(batched) == 3
+        for crop, result in zip(crops, batched):
+            single = emotion_model.predict_emotion(crop)
+            assert result["label"] == single["label"]
+            for label in EMOTION_LABELS:
+                assert abs(result["scores"][label] - single["scores"][label]) < 1e-3
+
+    def test_empty_batch(self, stub_emotion):
+        assert emotion_model.predict_emotion_batch([]) == []
+
+    def test_unavailable_model_returns_default_per_crop(self, monkeypatch):
+        monkeypatch.setattr(emotion_model, "_model", emotion_model._LOAD_FAILED)
+        results = emotion_model.predict_emotion_batch(_crops(2))
+        assert [r["label"] for r in results] == ["Neutral", "Neutral"]
+        assert all(r["confidence"] == 0.0 for r in results)
+
+
+class TestClipBatch:
+    def test_batch_preserves_order(self, stub_clip):
+        dark = np.full((80, 80, 3), 10, dtype=np.uint8)
+        bright = np.full((80, 80, 3), 240, dtype=np.uint8)
+        results = clip_model.predict_clip_deepfake_batch([dark, bright])
+        assert len(results) == 2
+        # Brighter crop → larger real-logit → higher authenticity
+        assert results[1]["authenticityScore"] > results[0]["authenticityScore"]
+
+    def test_batch_matches_single(self, stub_clip):
+        crops = _crops(3, seed=1)
+        batched = clip_model.predict_clip_deepfake_batch(crops)
+        for crop, result in zip(crops, batched):
+            single = clip_model.predict_clip_deepfake(crop)
+            assert abs(result["authenticityScore"] - single["authenticityScore"]) < 1e-3
+            assert result["riskLevel"] == single["riskLevel"]
+
+    def test_unavailable_model_returns_default_per_crop(self, monkeypatch):
+        monkeypatch.setattr(clip_model, "_model", clip_model._LOAD_FAILED)
+        results = clip_model.predict_clip_deepfake_batch(_crops(2))
+        assert len(results) == 2
+        assert all(r["authenticityScore"] is None for r in results)
+
+
+class _TinyConvNet(nn.Module):
+    """Small conv net with EmotionNet's call contract; compiles in seconds."""
+
+    def __init__(self):
+        super().__init__()
+        self.conv = nn.Conv2d(3, 8, 3)
+        self.head = nn.Linear(8, 7)
+
+    def forward(self, x):
+        return self.head(self.conv(x / 255).mean(dim=(2, 3)))
+
+
+class TestEmotionCompile:
+    def test_first_batch_does_not_recompile(self, monkeypatch):
+        import torch._dynamo
+        from torch._dynamo.utils import counters
+
+        net = _TinyConvNet().to(memory_format=torch.channels_last)
+        net.train(False)
+        net._device, net._dtype = "cpu", torch.float32
+        torch._dynamo.reset()
+        counters.clear()
+        compiled = emotion_model._compile_model(net, 32)
+        if compiled is net:
+            pytest.skip("torch.compile unavailable here")
+        graphs = counters["stats"]["unique_graphs"]
+
+        monkeypatch.setattr(emotion_model, "_model", compiled)
+        monkeypatch.setattr(emotion_model, "_preprocess", emotion_model._build_preprocess(32))
+        for n in (1, 3):
+            results = emotion_model.predict_emotion_batch(_crops(n))
+            assert all(r["confidence"] > 0 for r in results)  # not the error fallback
+        assert counters["stats"]["unique_graphs"] == graphs
+        torch._dynamo.reset()
+
+
+class TestEmotionOnnx:
+    def test_onnx_matches_torch(self, tmp_path):
+        pytest.importorskip("onnx")
+        pytest.importorskip("onnxruntime")
+        import importlib.util
+        import os
+
+        script = os.path.join(os.path.dirname(os.path.dirname(__file__)), "scripts", "export_emotion_onnx.py")
+        spec = importlib.util.spec_from_file_location("export_emotion_onnx", script)
+        exporter = importlib.util.module_from_spec(spec)
+        spec.loader.exec_module(exporter)
+
+        torch.manual_seed(0)
+        net = emotion_model.EmotionNet(num_classes=7, backbone_name="mobilenetv2")
+        net.train(False)
+        onnx_path = str(tmp_path / "emotion.onnx")
+        exporter.export_onnx(net, 64, onnx_path)
+
+        onnx_net = emotion_model.OnnxEmotionNet(onnx_path)
+        assert onnx_net.img_size == 64
+        x = torch.randint(0, 256, (3, 3, 64, 64)).float()  # model normalizes [0, 255] RGB itself
+        with torch.no_grad():
+            expected = net(x)
+        np.testing.assert_allclose(onnx_net(x).numpy(), expected.numpy(), rtol=1e-3, atol=1e-4)
+
+    def test_quantize_leaves_convs_fp32(self, tmp_path):
+        onnx = pytest.importorskip("onnx")
+        pytest.importorskip("onnxruntime")
+        import importlib.util
+        import os
+
+        script = os.path.join(os.path.dirname(os.path.dirname(__file__)), "scripts", "export_emotion_onnx.py")
+        spec = importlib.util.spec_from_file_location("export_emotion_onnx", script)
+        exporter = importlib.util.module_from_spec(spec)
+        spec.loader.exec_module(exporter)
+
+        net = emotion_model.EmotionNet(num_classes=7, backbone_name="mobilenetv2")
+        net.train(False)
+        fp32_path, int8_path = str(tmp_path / "fp32.onnx"), str(tmp_path / "int8.onnx")
+        exporter.export_onnx(net, 64, fp32_path)
+        exporter.quantize_onnx(fp32_path, int8_path)
+
+        ops = {node.op_type for node in onnx.load(int8_path).graph.node}
+        assert "Conv" in ops
+        assert "ConvInteger" not in ops  # ORT's int8 conv is ~10x slower than fp32 on CPU
+
+    @pytest.fixture
+    def fresh_loader(self, tmp_path, monkeypatch):
+        """Valid .pth checkpoint in tmp_path, empty singleton, CPU device."""
+        torch.manual_seed(0)
+        net = emotion_model.EmotionNet(num_classes=7, backbone_name="mobilenetv2")
+        pth = tmp_path / "emotion_weights.pth"
+        torch.save({"model_state_dict": net.state_dict(), "backbone": "mobilenetv2", "img_size": 64}, pth)
+        onnx = tmp_path / "emotion_weights.onnx"
+        monkeypatch.setattr(emotion_model, "EMOTION_WEIGHTS_PATH", str(pth))
+        monkeypatch.setattr(emotion_model, "EMOTION_ONNX_PATH", str(onnx))
+        monkeypatch.setattr(emotion_model, "_model", None)
+        monkeypatch.setattr(emotion_model, "_preprocess", None)
+        monkeypatch.setattr(torch.cuda, "is_available", lambda: False)
+        monkeypatch.setattr(torch.backends.mps, "is_available", lambda: False)
+        return pth, onnx
+
+    def test_corrupt_onnx_falls_back_to_pth(self, fresh_loader):
+        pytest.importorskip("onnxruntime")
+        _, onnx = fresh_loader
+        onnx.write_bytes(b"not an onnx graph")
+        model = emotion_model.get_emotion_model()
+        assert isinstance(model, emotion_model.EmotionNet)
+
+    def test_stale_onnx_is_ignored(self, fresh_loader):
+        import os
+
+        pth, onnx = fresh_loader
+        onnx.write_bytes(b"stale export")
+        mtime = os.path.getmtime(pth)
+        os.utime(onnx, (mtime - 60, mtime - 60))
+        assert not emotion_model._onnx_export_is_current()
+        assert isinstance(emotion_model.get_emotion_model(), emotion_model.EmotionNet)
+
+
+class TestChunkedBatches:
+    def test_emotion_chunks_match_single_batch(self, stub_emotion, monkeypatch):
+        crops = _crops(5, seed=2)
+        full = emotion_model.predict_emotion_batch(crops)
+        monkeypatch.setattr(emotion_model, "INFERENCE_MAX_BATCH", 2)
+        chunked = emotion_model.predict_emotion_batch(crops)
+        assert [r["scores"] for r in chunked] == [r["scores"] for r in full]
+
+    def test_clip_chunks_match_single_batch(self, stub_clip, monkeypatch):
+        crops = _crops(5, seed=3)
+        full = clip_model.predict_clip_deepfake_batch(crops)
+        monkeypatch.setattr(clip_model, "INFERENCE_MAX_BATCH", 2)
+        assert clip_model.predict_clip_deepfake_batch(crops) == full
+
+    def test_zero_env_values_are_clamped(self, monkeypatch):
+        import importlib
+
+        import serve.config as config
+
+        monkeypatch.setenv("INFERENCE_MAX_BATCH", "0")
+        monkeypatch.setenv("FRAME_CONCURRENCY", "0")
+        try:
+            importlib.reload(config)
+            assert config.INFERENCE_MAX_BATCH == 1
+            assert config.FRAME_CONCURRENCY == 1
+        finally:
+            monkeypatch.undo()
+            importlib.reload(config)
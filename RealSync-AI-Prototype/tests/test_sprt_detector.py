@@ -0,0 +1,60 @@
+"""Tests for the SPRTDetector (session accumulation, stats, LRU bound)."""
+import numpy as np
+import pytest
+
+from serve.sprt_detector import SPRTDetector
+
+
+@pytest.fixture
+def sprt():
+    """Fresh SPRTDetector per test."""
+    s = SPRTDetector(max_sessions=3)
+    yield s
+    s.clear_all()
+
+
+class TestDecision:
+    def test_real_scores_decide_real(self, sprt):
+        for _ in range(30):
+            result = sprt.update("s1", 0.8)
+        assert result["decision"] == "real"
+
+    def test_fake_scores_decide_fake(self, sprt):
+        for _ in range(30):
+            result = sprt.update("s1", 0.2)
+        assert result["decision"] == "fake"
+
+    def test_none_score_not_counted(self, sprt):
+        result = sprt.update("s1", None)
+        assert result["framesAnalyzed"] == 0
+
+
+class TestSessionStats:
+    def test_running_stats_match_numpy(self, sprt):
+        scores = [0.52, 0.45, 0.5, 0.47, 0.49]  # around the midpoint → undecided
+        for score in scores:
+            sprt.update("s1", score)
+        stats = sprt.get_session_stats("s1")
+        assert stats["framesAnalyzed"] == len(scores)
+        assert stats["scoreMean"] == round(float(np.mean(scores)), 4)
+        assert stats["scoreStd"] == round(float(np.std(scores)), 4)
+        assert stats["scoreMin"] == min(scores)
+        assert stats["scoreMax"] == max(scores)
+
+
+class TestSessionBound:
+    def test_least_recently_used_session_evicted(self, sprt):
+        for sid in ("a", "b", "c"):
+            sprt.update(sid, 0.5)
+        sprt.update("a", 0.5)   # "b" is now least recently used
+        sprt.update("d", 0.5)
+        assert sprt.get_session_stats("a")["framesAnalyzed"] == 2
+        assert sprt.get_session_stats("b")["framesAnalyzed"] == 0
+
+    def test_read_paths_do_not_create_or_evict_sessions(self, sprt):
+        for sid in ("a", "b", "c"):
+            sprt.update(sid, 0.5)
+        assert sprt.get_session_stats("unknown") == {"framesAnalyzed": 0}
+        assert sprt.update("unknown", None)["framesAnalyzed"] == 0
+        assert "unknown" not in sprt._sessions
+        assert sprt.get_session_stats("a")["framesAnalyzed"] == 1
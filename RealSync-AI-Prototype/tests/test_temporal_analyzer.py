@@ -44,6 +44,17 @@ class TestEWMA:
         """Verify EWMA uses configured decay factor."""
         assert TEMPORAL_EWMA_DECAY == 0.90
 
+    def test_ewma_matches_recurrence(self, analyzer):
+        """Closed-form EWMA equals the chronological recurrence over the window."""
+        trusts = [0.9, 0.2, 0.75, 0.6, 0.95] * 5  # 25 frames, window of 15
+        for trust in trusts:
+            result = analyzer.record_frame("s1", _frame(trust=trust))
+        window = trusts[-15:]
+        expected = window[0]
+        for score in window[1:]:
+            expected = TEMPORAL_EWMA_DECAY * expected + (1 - TEMPORAL_EWMA_DECAY) * score
+        assert abs(result["smoothedTrustScore"] - round(expected, 4)) < 1e-9
+
 
 class TestTrend:
     def test_stable_trend(self, analyzer):